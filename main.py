@@ -6,17 +6,23 @@ Originally modified for the EPSON WF-7525 Series.
 """
 
 import argparse
+import copy
+import functools
 import itertools
 import json
+import operator
 import re
 import sys
 from dataclasses import dataclass
 from pathlib import Path
 from pprint import pprint
-from typing import Any, Optional, Type
+from typing import Any, Callable, Optional, Type
 
 import easysnmp
 
+EEPROM_RESPONSE_RE = re.compile(r"EE:[0-9A-F]{2}([0-9A-F]{2})([0-9A-F]{2})")
+HEX_BYTES = {f"{byte:02X}": byte for byte in range(0x100)}
+
 
 class Model:
     """Class to handle known printer models."""
@@ -24,24 +30,31 @@ class Model:
     JSON_PATH = Path(__file__).absolute().parent / "models.json"
 
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def get_all(cls: Type["Model"]) -> dict:
-        """Return dictionary of all known models."""
+        """Return dictionary of all known models, loaded once."""
         with open(cls.JSON_PATH, "r") as fd:
             return json.load(fd)
 
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def get_names(cls: Type["Model"]) -> tuple[str, ...]:
+        """Return names of all known models, sorted case-insensitively."""
+        return tuple(sorted(cls.get_all().keys(), key=str.lower))
+
     @classmethod
     def get(cls: Type["Model"], model: str) -> dict:
         """Return dictionary for specified model."""
         models = cls.get_all()
         try:
-            return models[model]
+            return copy.deepcopy(models[model])
         except KeyError as err:
             raise KeyError(f"Model '{model}' not found.") from err
 
     @classmethod
     def select(cls: Type["Model"]) -> str:
         """Interactively select a model from the list."""
-        models = sorted(list(cls.get_all().keys()), key=str.lower)
+        models = cls.get_names()
         for idx, name in enumerate(models):
             print(f"{idx}: {name}")
         select_idx = int(input("Select model: "))
@@ -61,6 +74,14 @@ class Printer:
     maintenance_levels: list[int]
     unknown_oids: list[int]
 
+    STAT_METHODS = {
+        "model_full": "query_model_full",
+        "serial_number": "query_serial_number",
+        "eeps2_version": "query_eeps2_version",
+        "ink_levels": "query_ink_levels",
+        "waste_ink_levels": "query_waste_ink_levels",
+    }
+
     def __post_init__(self: "Printer") -> None:
         """Initialise printer instance with a session."""
         self.session = Session(printer=self)
@@ -73,21 +94,37 @@ class Printer:
     @property
     def stats(self: "Printer") -> dict[str, Any]:
         """Return information about the printer."""
-        methods = [
-            "get_model_full",
-            "get_serial_number",
-            "get_eeps2_version",
-            "get_ink_levels",
-            "get_waste_ink_levels",
-        ]
-        return {
-            method[4:]: self.session.__getattribute__(method)() for method in methods
-        }
+        session = self.session
+        queries = [getattr(session, method)() for method in self.STAT_METHODS.values()]
+        return dict(zip(self.STAT_METHODS, session.run_queries(queries)))
+
+
+@dataclass(frozen=True)
+class Query:
+    """
+    Dataclass to store the values needed for a statistic.
+
+    parse is called with the values of oids followed by the EEPROM values of
+    eeprom_oids.
+    """
+
+    parse: Callable[[list[str]], Any]
+    oids: tuple[str, ...] = ()
+    eeprom_oids: tuple[int, ...] = ()
 
 
 class Session(easysnmp.Session):
     """SNMP session wrapper."""
 
+    # An EEPROM read or write varbind encodes to roughly 35-65 bytes, so 20 of
+    # them keep each request and response within a 1472-byte UDP payload.
+    MAX_REQUEST_OIDS = 20
+    MODEL_OID = "1.3.6.1.2.1.1.5.0"
+    MODEL_FULL_OID = "1.3.6.1.2.1.25.3.2.1.3.1"
+    EEPS2_VERSION_OID = "1.3.6.1.2.1.2.2.1.2.1"
+    SERIAL_NUMBER_OIDS = tuple(range(192, 202))
+    PASSWORD_CHECK_OID = 0x00
+
     def __init__(
         self: "Session", printer: Printer, community: str = "public", version: int = 1
     ) -> None:
@@ -101,89 +138,206 @@ class Session(easysnmp.Session):
         """Return value of OIDs."""
         return self.get(oids).value
 
-    def get_read_eeprom_oid(self: "Session", oid: int) -> str:
-        """Return address for reading from EEPROM for specified OID."""
+    def get_values(self: "Session", oids: list[str]) -> list[str]:
+        """Return values of OIDs, in requests of up to MAX_REQUEST_OIDS."""
+        values = []
+        for idx in range(0, len(oids), self.MAX_REQUEST_OIDS):
+            responses = self.get(oids[idx : idx + self.MAX_REQUEST_OIDS])
+            values.extend(response.value for response in responses)
+        return values
+
+    def get_read_eeprom_prefix(
+        self: "Session", password: Optional[list[int]] = None
+    ) -> str:
+        """Return start of address for reading from EEPROM, up to the OID."""
+        if password is None:
+            password = self.printer.password
         return (
             f"{self.printer.eeprom_link}"
             ".124.124.7.0"
-            f".{self.printer.password[0]}"
-            f".{self.printer.password[1]}"
-            ".65.190.160"
-            f".{oid}.0"
+            f".{password[0]}"
+            f".{password[1]}"
+            ".65.190.160."
         )
 
-    def get_write_eeprom_oid(self: "Session", oid: int, value: Any) -> str:
-        """Return address for writing to EEPROM for specified OID."""
+    def get_write_eeprom_prefix(self: "Session") -> str:
+        """Return start of address for writing to EEPROM, up to the OID."""
         return (
             f"{self.printer.eeprom_link}"
             ".124.124.16.0"
             f".{self.printer.password[0]}"
             f".{self.printer.password[1]}"
-            ".66.189.33"
-            f".{oid}.0.{value}"
+            ".66.189.33."
+        )
+
+    def get_read_eeprom_oid(
+        self: "Session", oid: int, password: Optional[list[int]] = None
+    ) -> str:
+        """Return address for reading from EEPROM for specified OID."""
+        return f"{self.get_read_eeprom_prefix(password)}{oid}.0"
+
+    def get_write_eeprom_oid(self: "Session", oid: int, value: Any) -> str:
+        """Return address for writing to EEPROM for specified OID."""
+        return (
+            f"{self.get_write_eeprom_prefix()}{oid}.0.{value}"
             f".{self.printer.eeprom_write}"
         )
 
-    def read_eeprom(self: "Session", oid: int) -> str:
-        """Read EEPROM data."""
-        response = self.get_value(self.get_read_eeprom_oid(oid))
-        response = re.findall(r"EE:[0-9A-F]{6}", response)[0][3:]
-        chk_addr = response[2:4]
-        value = response[4:6]
-        if int(chk_addr, 16) != oid:
+    @staticmethod
+    def parse_eeprom_response(oid: int, response: str) -> str:
+        """Return value from EEPROM read response for specified OID."""
+        match = EEPROM_RESPONSE_RE.search(response)
+        if match is None:
+            raise IndexError(f"No EEPROM data in response: {response!r}")
+        chk_addr, value = match.groups()
+        if HEX_BYTES[chk_addr] != oid:
             raise ValueError(
                 f"Address and response address are not equal: {oid} != {chk_addr}"
             )
         return value
 
+    def read_eeprom(self: "Session", oid: int) -> str:
+        """Read EEPROM data."""
+        response = self.get_value(self.get_read_eeprom_oid(oid))
+        return self.parse_eeprom_response(oid, response)
+
     def read_eeprom_many(self: "Session", oids: list[int]) -> list[str]:
         """Read EEPROM data with multiple values."""
-        return [self.read_eeprom(oid) for oid in oids]
+        oids = list(oids)
+        prefix = self.get_read_eeprom_prefix()
+        responses = self.get_values([f"{prefix}{oid}.0" for oid in oids])
+        return [
+            self.parse_eeprom_response(oid, response)
+            for oid, response in zip(oids, responses)
+        ]
 
     def write_eeprom(self: "Session", oid: int, value: int) -> None:
         """Write value to OID with specified type to EEPROM."""
         self.get(self.get_write_eeprom_oid(oid, value))
 
+    def write_eeprom_many(self: "Session", data: dict[int, int]) -> None:
+        """Write values to OIDs in EEPROM, in order."""
+        prefix = self.get_write_eeprom_prefix()
+        suffix = f".{self.printer.eeprom_write}"
+        self.get_values(
+            [f"{prefix}{oid}.0.{value}{suffix}" for oid, value in data.items()]
+        )
+
     def dump_eeprom(self: "Session", start: int = 0, end: int = 0xFF) -> dict[int, int]:
         """Dump EEPROM data from start to end."""
-        return {oid: int(self.read_eeprom(oid), 16) for oid in range(start, end)}
+        oids = range(start, end)
+        return {
+            oid: int(value, 16) for oid, value in zip(oids, self.read_eeprom_many(oids))
+        }
+
+    def run_queries(self: "Session", queries: list[Query]) -> list[Any]:
+        """
+        Return results of queries.
+
+        Plain values and EEPROM values for all queries are each fetched in one
+        batch, rather than one batch per query.
+        """
+        values = iter(self.get_values([oid for query in queries for oid in query.oids]))
+        eeprom = iter(
+            self.read_eeprom_many(
+                [oid for query in queries for oid in query.eeprom_oids]
+            )
+        )
+        return [
+            query.parse(
+                list(itertools.islice(values, len(query.oids)))
+                + list(itertools.islice(eeprom, len(query.eeprom_oids)))
+            )
+            for query in queries
+        ]
+
+    def run_query(self: "Session", query: Query) -> Any:
+        """Return result of a single query."""
+        return self.run_queries([query])[0]
 
     def get_model(self: "Session") -> str:
         """Return model of printer."""
-        return self.get_value("1.3.6.1.2.1.1.5.0")
+        return self.get_value(self.MODEL_OID)
 
     def get_model_full(self: "Session") -> str:
         """Return full model of printer."""
-        return self.get_value("1.3.6.1.2.1.25.3.2.1.3.1")
+        return self.run_query(self.query_model_full())
 
     def get_serial_number(self: "Session") -> str:
         """Return serial number of printer."""
-        return "".join(
-            chr(int(value, 16))
-            for value in self.read_eeprom_many(
-                [192, 193, 194, 195, 196, 197, 198, 199, 200, 201]
-            )
-        )
+        return self.run_query(self.query_serial_number())
 
     def get_eeps2_version(self: "Session") -> str:
         """Return EEPS2 version."""
-        return self.get_value("1.3.6.1.2.1.2.2.1.2.1")
+        return self.run_query(self.query_eeps2_version())
 
     def get_ink_levels(self: "Session") -> dict[str, int]:
         """Return ink levels of printer."""
-        result = self.get_value(f"{self.printer.eeprom_link}.115.116.1.0.1")
+        return self.run_query(self.query_ink_levels())
+
+    def get_waste_ink_levels(self: "Session") -> list[float]:
+        """Return waste ink levels as a percentage."""
+        return self.run_query(self.query_waste_ink_levels())
+
+    def query_model_full(self: "Session") -> Query:
+        """Return query for full model of printer."""
+        return Query(parse=operator.itemgetter(0), oids=(self.MODEL_FULL_OID,))
+
+    def query_serial_number(self: "Session") -> Query:
+        """Return query for serial number of printer."""
+        return Query(
+            parse=self._parse_serial_number, eeprom_oids=self.SERIAL_NUMBER_OIDS
+        )
+
+    def query_eeps2_version(self: "Session") -> Query:
+        """Return query for EEPS2 version."""
+        return Query(parse=operator.itemgetter(0), oids=(self.EEPS2_VERSION_OID,))
+
+    def query_ink_levels(self: "Session") -> Query:
+        """Return query for ink levels of printer."""
+        return Query(
+            parse=self._parse_ink_levels,
+            oids=(f"{self.printer.eeprom_link}.115.116.1.0.1",),
+        )
+
+    def query_waste_ink_levels(self: "Session") -> Query:
+        """Return query for waste ink levels as a percentage."""
+        waste_inks = [
+            waste_ink
+            for waste_ink in self.printer.waste_inks
+            if waste_ink["total"] is not None
+        ]
+        return Query(
+            parse=functools.partial(self._parse_waste_ink_levels, waste_inks),
+            eeprom_oids=tuple(
+                oid for waste_ink in waste_inks for oid in waste_ink["oids"]
+            ),
+        )
+
+    @staticmethod
+    def _parse_serial_number(values: list[str]) -> str:
+        """Return serial number from EEPROM values."""
+        return bytes.fromhex("".join(values)).decode("latin-1")
+
+    def _parse_ink_levels(self: "Session", values: list[str]) -> dict[str, int]:
+        """Return ink levels from ink levels value."""
+        result = values[0]
         return {
             colour: ord(result[idx]) for colour, idx in self.printer.ink_levels.items()
         }
 
-    def get_waste_ink_levels(self: "Session") -> list[float]:
-        """Return waste ink levels as a percentage."""
+    @staticmethod
+    def _parse_waste_ink_levels(
+        waste_inks: list[dict], values: list[str]
+    ) -> list[float]:
+        """Return waste ink levels as a percentage from EEPROM values."""
+        values = iter(values)
         results = []
-        for waste_ink in self.printer.waste_inks:
-            if waste_ink["total"] is None:
-                continue
-            level = self.read_eeprom_many(waste_ink["oids"])
-            level_b10 = int("".join(reversed(level)), 16)
+        for waste_ink in waste_inks:
+            level = itertools.islice(values, len(waste_ink["oids"]))
+            level_b10 = 0
+            for shift, value in enumerate(level):
+                level_b10 |= int(value, 16) << (8 * shift)
             results.append(round((level_b10 / waste_ink["total"]) * 100, 2))
         return results
 
@@ -194,32 +348,41 @@ class Session(easysnmp.Session):
         hex(int((80 / 100) * 19650)) == 0x3d68
         hex(104), hex(61) = (0x68, 0x3d)
         """
-        waste_inks = {
-            oid: 0 for waste_ink in self.printer.waste_inks for oid in waste_ink["oids"]
-        }
-        maintenance_levels = {
-            maintenance_level: 94
-            for maintenance_level in self.printer.maintenance_levels
-        }
-        data = {unknown_oid: 0 for unknown_oid in self.printer.unknown_oids}
-        data.update(waste_inks)
-        data.update(maintenance_levels)
-        for oid, value in data.items():
-            self.write_eeprom(oid, value)
+        data = dict.fromkeys(self.printer.unknown_oids, 0)
+        for waste_ink in self.printer.waste_inks:
+            data.update(dict.fromkeys(waste_ink["oids"], 0))
+        data.update(dict.fromkeys(self.printer.maintenance_levels, 94))
+        self.write_eeprom_many(data)
 
     def brute_force(
         self: "Session", minimum: int = 0x00, maximum: int = 0xFF
     ) -> Optional[list[int]]:
-        """Brute force password for printer."""
-        for x, y in itertools.permutations(range(minimum, maximum), r=2):
-            self.printer.password = [x, y]
-            print(f"Trying {self.printer.password}...")
-            try:
-                self.read_eeprom(0x00)
+        """
+        Brute force password for printer.
+
+        Each request tries up to MAX_REQUEST_OIDS passwords, with one EEPROM
+        read per candidate password.
+        """
+        passwords = itertools.product(range(minimum, maximum), repeat=2)
+        while candidates := [
+            list(password)
+            for password in itertools.islice(passwords, self.MAX_REQUEST_OIDS)
+        ]:
+            print(f"Trying {candidates[0]} to {candidates[-1]}...")
+            responses = self.get(
+                [
+                    self.get_read_eeprom_oid(self.PASSWORD_CHECK_OID, password)
+                    for password in candidates
+                ]
+            )
+            for password, response in zip(candidates, responses):
+                try:
+                    self.parse_eeprom_response(self.PASSWORD_CHECK_OID, response.value)
+                except IndexError:
+                    continue
+                self.printer.password = password
                 print(f"Password found: {self.printer.password}")
                 return self.printer.password
-            except IndexError:
-                continue
         return None
 
 
@@ -255,7 +418,7 @@ def main() -> None:
     args = parse_args()
 
     printer = Printer.from_model(args.host, args.model)
-    session = Session(printer)
+    session = printer.session
 
     if args.brute_force:
         if not session.brute_force():
@@ -1,17 +1,25 @@
 """Parse WICReset application logs to obtain model OID structure."""
 
 import argparse
-import itertools
+import functools
 import json
 import re
 from pathlib import Path
 from pprint import pprint
+from typing import Iterable
 
 EEPROM_LINK = "1.3.6.1.4.1.1248.1.2.2.44.1.1.2.1"
 WRITE_PREFIX = "124.124.16.0."
 WRITE_MIDDLE = ".66.189.33."
 PASSWORD_LENGTH = 2
 EEPROM_WRITE_LENGTH = 8
+RESET_STARTED = "Reset started. Do not turn off the printer"
+RESET_COMPLETE = "Reset complete"
+RESET_INVALID_KEY = "The input key does not exist"
+MODEL_RE = re.compile("RESET_GUID RESET GUID: (.*) [0-9]* KEY")
+RESET_DATA_RE = re.compile(
+    r"RESET_DATA RESET DATA: [0-9]* -[ \t]*(.*?)[ \t]*(?:REAL)?[ \t]*$", re.MULTILINE
+)
 
 
 class WicresetLog:
@@ -20,53 +28,100 @@ class WicresetLog:
     def __init__(self, path: str | Path) -> None:
         """Initialise instance with path to log."""
         self.path = path
+        self._model_line = ""
+        self._section_lines = None
         with open(self.path) as log:
-            self.content = log.read()
+            self._parse(log)
+
+    def _parse(self, log: Iterable[str]) -> None:
+        """
+        Store model line and waste ink counter reset section from log.
+
+        The section runs from the first reset start to the last reset
+        completion before an invalid key, to match earlier regex parsing.
+        """
+        section = None
+        complete = None
+        for line in log:
+            line = line.rstrip("\n")
+            if not self._model_line and MODEL_RE.search(line):
+                self._model_line = line
+            if self._section_lines is not None:
+                if self._model_line:
+                    break
+            elif section is None:
+                if RESET_STARTED in line:
+                    section = []
+                    complete = None
+            elif RESET_INVALID_KEY in line:
+                if complete is None:
+                    section = None
+                else:
+                    self._section_lines = section[:complete]
+            else:
+                if RESET_COMPLETE in line:
+                    complete = len(section)
+                section.append(line)
+        if self._section_lines is None and complete is not None:
+            self._section_lines = section[:complete]
 
     def get_model(self) -> str:
         """Return model from log."""
-        return re.search("RESET_GUID RESET GUID: (.*) [0-9]* KEY", self.content).group(1)
+        return MODEL_RE.search(self._model_line).group(1)
 
     def _get_waste_ink_reset_section(self) -> list[str]:
         """Return section for waste ink counter reset."""
-        return re.search(
-            r"Reset started\. Do not turn off the printer(?:(?!The input key does not exist).)+Reset complete",
-            self.content,
-            re.DOTALL,
-        )[0].splitlines()[1:-1]
+        if self._section_lines is None:
+            raise ValueError("Waste ink counter reset not found in log")
+        return self._section_lines
 
     def get_waste_ink_reset_writes_as_hex(self) -> list[str]:
         """Return list of lines for actual writes during reset as hex."""
-        oids = []
-        section = self._get_waste_ink_reset_section()
-        for line in section:
-            match = re.search(r".*RESET_DATA RESET DATA: [0-9]* -\s*.*", line)
-            if not match:
-                continue
-            oids.append(match[0].split("-")[1].replace("REAL", "").strip())
-        return oids
+        section = "\n".join(self._get_waste_ink_reset_section())
+        return [match[1] for match in RESET_DATA_RE.finditer(section)]
 
-    def get_waste_ink_reset_writes(self) -> list[str]:
-        """Return list of OIDs for actual writes during reset."""
+    @functools.cached_property
+    def _waste_ink_reset_writes(self) -> list[str]:
+        """Return cached list of OIDs for actual writes during reset."""
         return [
             self.convert_hex_to_oid(line)
             for line in self.get_waste_ink_reset_writes_as_hex()
         ]
 
+    def get_waste_ink_reset_writes(self) -> list[str]:
+        """Return list of OIDs for actual writes during reset."""
+        return list(self._waste_ink_reset_writes)
+
     def get_eeprom_write(self) -> list[str]:
         """Return list for eeprom_write section of OID."""
-        write = self.get_waste_ink_reset_writes()[0].split(".")
+        write = self._waste_ink_reset_writes[0].split(".")
         return write[-EEPROM_WRITE_LENGTH:]
 
     def get_password(self) -> tuple[int, int]:
         """Return tuple for printer password."""
         password = (
-            self.get_waste_ink_reset_writes()[0]
+            self._waste_ink_reset_writes[0]
             .removeprefix(WRITE_PREFIX)
             .split(".")[:PASSWORD_LENGTH]
         )
         return tuple(int(part) for part in password)
 
+    @functools.cached_property
+    def _waste_ink_reset_values(self) -> dict[int, int]:
+        """Return cached dictionary of OIDs to values set during counter reset."""
+        password = self.convert_list_to_oid(self.get_password())
+        eeprom_write = self.convert_list_to_oid(self.get_eeprom_write())
+        write_re = re.compile(
+            re.escape(f"{WRITE_PREFIX}{password}{WRITE_MIDDLE}")
+            + r"([0-9]+)\.[0-9]+\.([0-9]+)(?:\.[0-9]+)*"
+            + re.escape(f".{eeprom_write}")
+        )
+        return {
+            int(match[1]): int(match[2])
+            for write in self._waste_ink_reset_writes
+            if (match := write_re.fullmatch(write))
+        }
+
     def get_waste_ink_reset_values_as_dict(self) -> dict[int, int]:
         """
         Return dictionary of OIDs to values set during counter reset.
@@ -74,19 +129,7 @@ class WicresetLog:
         The format for setting values is:
         {eeprom_link}.124.124.16.0.{password}.66.189.33.{oid}.0.{value}.{eeprom_write}
         """
-        values = {}
-        writes = self.get_waste_ink_reset_writes()
-        for write in writes:
-            write = write.removeprefix(
-                f"{WRITE_PREFIX}{self.convert_list_to_oid(self.get_password())}{WRITE_MIDDLE}"
-            ).removesuffix(f".{self.convert_list_to_oid(self.get_eeprom_write())}")
-            write = write.split(".")
-            try:
-                write = ((int(write[0]), int(write[2])),)
-            except IndexError:
-                continue
-            values.update(dict(write))
-        return values
+        return dict(self._waste_ink_reset_values)
 
     def get_waste_ink_groups(self) -> list[list[int]]:
         """Return nested lists of grouped OIDs for waste ink counters."""
@@ -101,15 +144,14 @@ class WicresetLog:
     ) -> dict[tuple[int], int | None]:
         """Return tuple of waste ink counter totals."""
         groups = self.get_waste_ink_groups()
-        writes = self.get_waste_ink_reset_values_as_dict()
+        writes = self._waste_ink_reset_values
         totals = {}
         if len(groups) != 3 or any(len(group) > 2 for group in groups):
             raise ValueError("Unknown structure of waste ink counters")
         for group in groups:
-            hex_str = ""
+            value = 0
             for oid in reversed(group):
-                hex_str += f"{writes[oid]:02x}"
-            value = int(hex_str, 16)
+                value = (value << 8) | writes[oid]
             total = (value / percentage) * 100
             if total == 0:
                 total = None
@@ -119,9 +161,7 @@ class WicresetLog:
     def get_maintenance_levels(self) -> tuple[int, int]:
         """Return OIDs where maintenance levels are stored."""
         return tuple(
-            oid
-            for oid, value in self.get_waste_ink_reset_values_as_dict().items()
-            if value == 94
+            oid for oid, value in self._waste_ink_reset_values.items() if value == 94
         )
 
     def get_unknown_oids(self) -> tuple[int, ...]:
@@ -159,7 +199,7 @@ class WicresetLog:
     @staticmethod
     def convert_hex_to_oid(oid: str) -> str:
         """Convert hexadecimal string to OID format."""
-        return ".".join(str(int(part, 16)) for part in oid.split())
+        return ".".join(map(str, bytes.fromhex(oid)))
 
     @staticmethod
     def convert_list_to_oid(oid: list[int]) -> str:
@@ -169,12 +209,13 @@ class WicresetLog:
     @staticmethod
     def get_consecutive_values(values: list[int]) -> list[list[int]]:
         """Return groups of consecutive values from list."""
-        return [
-            [value[1] for value in group]
-            for _, group in itertools.groupby(
-                enumerate(values), lambda element: element[0] - element[1]
-            )
-        ]
+        groups = []
+        for value in values:
+            if groups and value == groups[-1][-1] + 1:
+                groups[-1].append(value)
+            else:
+                groups.append([value])
+        return groups
 
 
 def parse_args() -> argparse.Namespace: